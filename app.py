@@ -1,9 +1,10 @@
 import os
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from db import init_db, save_exam, save_processed_question, get_exams, get_exam_details
+from db import init_db, save_exam, save_questions, load_questions, save_question_answer, get_exams, get_exam_details
 import PyPDF2
-import docx
+from parser import iter_docx_paragraphs, parse_exam_file
+from llm import answer_question
 from datetime import datetime
 from storage import FileStorage
 import shutil
@@ -159,8 +160,7 @@ class ExamApp:
                         if page_text:
                             content += page_text + "\n"
             elif file_type in ['docx', 'doc']:
-                doc = docx.Document(file_path)
-                content = "\n".join([paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()])
+                content = "\n".join(text for text in iter_docx_paragraphs(file_path) if text.strip())
             elif file_type == 'txt':
                 with open(file_path, 'r', encoding='utf-8') as file:
                     content = file.read()
@@ -274,11 +274,12 @@ class ExamApp:
         file_type = exam['file_type']
         content = self.read_file_content(file_path, file_type)
         
-        # 存入整理好的试题表（当前仅保存原始内容）
-        save_processed_question(exam_id, content)
+        # 解析题目并存入整理好的试题表
+        questions = parse_exam_file(file_path, self.detect_file_type(file_path))['questions']
+        save_questions(exam_id, questions)
         
         self.processed_text.delete(1.0, tk.END)
-        processed_content = f"试卷: {exam['title']} ({exam['subject']})\n整理时间: {exam['upload_date']}\n\n{content}"
+        processed_content = f"试卷: {exam['title']} ({exam['subject']})\n整理时间: {exam['upload_date']}\n共 {len(questions)} 题\n\n{content}"
         self.processed_text.insert(tk.END, processed_content)
         self.notebook.select(self.processed_tab)
         self.root.update()
@@ -286,7 +287,38 @@ class ExamApp:
         messagebox.showinfo("成功", f"已整理试卷 {exam['title']} 的试题")
     
     def generate_answers(self):
-        messagebox.showinfo("提示", "答案生成功能暂未实现，因为未解析问题。")
+        selected = self.exam_list.selection()
+        if not selected:
+            messagebox.showwarning("警告", "请先选择一个试卷")
+            return
+        
+        exam_id = self.exam_list.item(selected[0])['values'][0]
+        questions = load_questions(exam_id)
+        if not questions:
+            messagebox.showwarning("提示", "请先整理试题")
+            return
+        
+        self.answer_text.delete(1.0, tk.END)
+        self.notebook.select(self.answer_tab)
+        self.progress_var.set(0)
+        self.progress_bar.grid()
+        try:
+            for index, question in enumerate(questions, 1):
+                result = answer_question(question)
+                if result['model'] != "error":
+                    save_question_answer(question.id, result['answer'], result['explanation'])
+                self.answer_text.insert(tk.END, f"题号 {question.number}: {result['answer']}\n")
+                if result['explanation']:
+                    self.answer_text.insert(tk.END, f"解析: {result['explanation']}\n")
+                self.answer_text.insert(tk.END, "\n")
+                self.progress_var.set(index * 100 / len(questions))
+                self.root.update()
+            messagebox.showinfo("成功", f"已生成 {len(questions)} 道题的答案")
+        except Exception as e:
+            messagebox.showerror("错误", f"生成答案失败: {str(e)}")
+            logger.error(f"Generate answers error: {str(e)}")
+        finally:
+            self.progress_bar.grid_remove()
 
 if __name__ == "__main__":
     root = tk.Tk()
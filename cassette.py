@@ -0,0 +1,118 @@
+"""LLM 请求录制/回放
+
+录制模式下把每次请求及其响应追加写入 JSONL 磁带文件；
+回放模式下按请求内容哈希直接返回录制的响应，不访问网络，便于复现线上延迟和结果。
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+class CassetteMiss(Exception):
+    """回放模式下找不到对应的录制记录"""
+
+class RecordedHTTPError(Exception):
+    """回放的响应状态码为错误时抛出，与 requests.HTTPError 一样带有 response 属性"""
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+class RecordedResponse:
+    """回放时使用的响应对象，提供与 requests.Response 相同的常用接口"""
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RecordedHTTPError(f"Recorded HTTP error {self.status_code}", self)
+
+def request_key(payload):
+    """对请求体做规范化序列化后取哈希，作为录制记录的键"""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+# 录制时保留的响应头，回放时用于重试等待
+RECORDED_HEADERS = ('Retry-After',)
+
+class Cassette:
+    def __init__(self, path, mode=MODE_OFF, replay_latency=False):
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        # 同一请求可能被录制多次（重试、压测），按录制顺序保存并依次回放
+        self.entries = {}
+        self.cursors = {}
+        self.lock = threading.Lock()
+        if mode == MODE_REPLAY:
+            self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette file not found: {self.path}")
+        count = 0
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries.setdefault(entry['key'], []).append(entry)
+                    count += 1
+        logger.info(f"Loaded {count} recorded responses from {self.path}")
+
+    def replay(self, payload):
+        key = request_key(payload)
+        entries = self.entries.get(key)
+        if not entries:
+            raise CassetteMiss("No recorded response for this request")
+        with self.lock:
+            # 全部回放完后从头循环，便于用较少的录制驱动长时间压测
+            index = self.cursors.get(key, 0)
+            self.cursors[key] = (index + 1) % len(entries)
+        entry = entries[index]
+        if self.replay_latency and entry.get('elapsed'):
+            time.sleep(entry['elapsed'])
+        return RecordedResponse(entry['status'], entry['body'], entry.get('headers'))
+
+    def record(self, payload, response, elapsed):
+        # 保存原始响应文本，网关返回的 HTML 错误页等非 JSON 内容也能原样回放
+        entry = {
+            'key': request_key(payload),
+            'request': payload,
+            'status': response.status_code,
+            'headers': {name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            'body': response.text,
+            'elapsed': round(elapsed, 4)
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+    def post(self, send, payload):
+        """
+        通过磁带发送请求
+        :param send: 实际发送请求的函数，参数为请求体，返回响应对象
+        :param payload: 请求体
+        :return: 响应对象
+        """
+        if self.mode == MODE_REPLAY:
+            return self.replay(payload)
+        start = time.perf_counter()
+        response = send(payload)
+        if self.mode == MODE_RECORD:
+            self.record(payload, response, time.perf_counter() - start)
+        return response
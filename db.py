@@ -1,7 +1,10 @@
 import sqlite3
 from contextlib import contextmanager
+import hashlib
+import json
 import logging
 from datetime import datetime
+from models import Question
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -46,6 +49,7 @@ def init_db():
         cursor = conn.cursor()
         
         # 删除旧表（如果存在）
+        cursor.execute('DROP TABLE IF EXISTS question_options')
         cursor.execute('DROP TABLE IF EXISTS processed_questions')
         cursor.execute('DROP TABLE IF EXISTS exams')
         
@@ -64,6 +68,7 @@ def init_db():
             file_path TEXT,
             file_type TEXT,
             status TEXT DEFAULT 'pending',
+            content_hash TEXT,
             last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
         
         cursor.execute('''CREATE TABLE IF NOT EXISTS processed_questions (
@@ -72,21 +77,40 @@ def init_db():
             question_number TEXT NOT NULL,
             content TEXT NOT NULL,
             question_type TEXT,
-            options TEXT,
             correct_answer TEXT,
             analysis TEXT,
+            content_hash TEXT,
             processed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (exam_id) REFERENCES exams (id))''')
         
+        cursor.execute('''CREATE TABLE IF NOT EXISTS question_options (
+            question_id INTEGER NOT NULL,
+            label TEXT NOT NULL,
+            content TEXT NOT NULL,
+            PRIMARY KEY (question_id, label),
+            FOREIGN KEY (question_id) REFERENCES processed_questions (id)) WITHOUT ROWID''')
+        
         # 创建索引
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_exam_year ON exams(year)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_exam_type ON exams(exam_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_question_exam_id ON processed_questions(exam_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_exam_hash ON exams(content_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_question_hash ON processed_questions(exam_id, content_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_exam_modified ON exams(last_modified)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_question_type_answer ON processed_questions(question_type, correct_answer)')
         
         conn.commit()
         logger.info("Database initialized successfully")
 
+EXAM_HASH_FIELDS = ('title', 'subject', 'year', 'month', 'level', 'exam_type', 'file_path', 'file_type')
+QUESTION_HASH_FIELDS = ('question_number', 'content', 'question_type', 'options')
+
+def content_hash(record, fields):
+    """按指定字段计算内容哈希，用于导入时去重"""
+    canonical = json.dumps([record.get(field) for field in fields], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
 def save_exam(title, subject, year, month, level, exam_type, is_real, has_analysis, file_path, file_type):
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -94,32 +118,140 @@ def save_exam(title, subject, year, month, level, exam_type, is_real, has_analys
             INSERT INTO exams (
                 title, subject, year, month, level, exam_type, 
                 is_real, has_analysis, file_path, file_type, 
-                upload_date, last_modified
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                content_hash, upload_date, last_modified
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             title, subject, year, month, level, exam_type,
             is_real, has_analysis, file_path, file_type,
+            content_hash({
+                'title': title, 'subject': subject, 'year': year, 'month': month, 'level': level,
+                'exam_type': exam_type, 'file_path': file_path, 'file_type': file_type
+            }, EXAM_HASH_FIELDS),
             datetime.now(), datetime.now()
         ))
         exam_id = cursor.lastrowid
         logger.info(f"Saved exam with ID: {exam_id}")
         return exam_id
 
+def _normalize_options(options):
+    """兼容旧数据中以 JSON 字符串保存的选项"""
+    if isinstance(options, str):
+        options = json.loads(options) if options else None
+    return options or None
+
+def _question_hash_fields(question):
+    return {
+        'question_number': question.number, 'content': question.text,
+        'question_type': question.type, 'options': question.options
+    }
+
+def _insert_question(cursor, exam_id, question, question_hash=None, processed_date=None):
+    now = datetime.now()
+    if question_hash is None:
+        question_hash = content_hash(_question_hash_fields(question), QUESTION_HASH_FIELDS)
+    cursor.execute('''
+        INSERT INTO processed_questions (
+            exam_id, question_number, content, question_type,
+            correct_answer, analysis, content_hash,
+            processed_date, last_modified
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        exam_id, question.number, question.text, question.type,
+        question.correct_answer, question.analysis, question_hash,
+        processed_date or now, now
+    ))
+    question.id = cursor.lastrowid
+    question.exam_id = exam_id
+    if question.options:
+        cursor.executemany(
+            'INSERT INTO question_options (question_id, label, content) VALUES (?, ?, ?)',
+            [(question.id, label, text) for label, text in question.options.items()])
+    return question.id
+
 def save_processed_question(exam_id, question_number, content, question_type=None, options=None, correct_answer=None, analysis=None):
+    question = Question(
+        number=question_number, text=content, type=question_type,
+        options=_normalize_options(options), correct_answer=correct_answer, analysis=analysis
+    )
     with get_db_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO processed_questions (
-                exam_id, question_number, content, question_type,
-                options, correct_answer, analysis,
-                processed_date, last_modified
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            exam_id, question_number, content, question_type,
-            options, correct_answer, analysis,
-            datetime.now(), datetime.now()
-        ))
+        _insert_question(conn.cursor(), exam_id, question)
         logger.info(f"Saved processed question for exam ID: {exam_id}")
+        return question.id
+
+def save_questions(exam_id, questions):
+    """
+    在一个事务中批量保存题目及其选项
+    :param questions: Question 列表
+    :return: 保存的题目数量
+    """
+    count = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        for question in questions:
+            _insert_question(cursor, exam_id, question)
+            count += 1
+        logger.info(f"Saved {count} questions for exam ID: {exam_id}")
+        return count
+
+def _load_options(cursor, question_ids):
+    """批量加载选项，返回 {question_id: {label: content}}"""
+    options = {}
+    question_ids = list(question_ids)
+    # 分批查询，避免超过 SQLite 参数数量限制
+    for start in range(0, len(question_ids), 500):
+        chunk = question_ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(
+            f'SELECT question_id, label, content FROM question_options '
+            f'WHERE question_id IN ({placeholders}) ORDER BY question_id, label', chunk)
+        for row in cursor.fetchall():
+            options.setdefault(row['question_id'], {})[row['label']] = row['content']
+    return options
+
+def _load_exam_question_rows(cursor, exam_id):
+    cursor.execute('SELECT * FROM processed_questions WHERE exam_id = ? ORDER BY question_number', (exam_id,))
+    rows = cursor.fetchall()
+    cursor.execute('''
+        SELECT o.question_id, o.label, o.content FROM question_options o
+        JOIN processed_questions q ON q.id = o.question_id
+        WHERE q.exam_id = ? ORDER BY o.question_id, o.label
+    ''', (exam_id,))
+    options = {}
+    for row in cursor.fetchall():
+        options.setdefault(row['question_id'], {})[row['label']] = row['content']
+    return rows, options
+
+def load_questions(exam_id):
+    """加载试卷的全部题目（含选项），返回 Question 列表"""
+    with get_db_connection() as conn:
+        rows, options = _load_exam_question_rows(conn.cursor(), exam_id)
+        return [Question.from_row(row, options.get(row['id'])) for row in rows]
+
+def find_questions(question_type=None, correct_answer=None, exam_id=None):
+    """
+    按题型、答案查询题目，走 (question_type, correct_answer) 索引
+    例如 find_questions(QuestionType.SINGLE_CHOICE, 'C')
+    """
+    conditions = []
+    params = []
+    if question_type is not None:
+        conditions.append('question_type = ?')
+        params.append(question_type)
+    if correct_answer is not None:
+        conditions.append('correct_answer = ?')
+        params.append(correct_answer)
+    if exam_id is not None:
+        conditions.append('exam_id = ?')
+        params.append(exam_id)
+    query = 'SELECT * FROM processed_questions'
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        options = _load_options(cursor, [row['id'] for row in rows])
+        return [Question.from_row(row, options.get(row['id'])) for row in rows]
 
 def get_exams(filters=None):
     with get_db_connection() as conn:
@@ -138,6 +270,12 @@ def get_exams(filters=None):
             if 'level' in filters:
                 conditions.append('level = ?')
                 params.append(filters['level'])
+            if 'since' in filters:
+                # 试卷本身或其任一题目在 since 之后有修改
+                conditions.append('''(last_modified > ? OR EXISTS (
+                    SELECT 1 FROM processed_questions q
+                    WHERE q.exam_id = exams.id AND q.last_modified > ?))''')
+                params.extend([filters['since'], filters['since']])
             if conditions:
                 query += ' WHERE ' + ' AND '.join(conditions)
         
@@ -153,12 +291,111 @@ def get_exam_details(exam_id):
         cursor.execute('SELECT * FROM exams WHERE id = ?', (exam_id,))
         exam = dict(cursor.fetchone())
         
-        cursor.execute('SELECT * FROM processed_questions WHERE exam_id = ? ORDER BY question_number', (exam_id,))
-        questions = [dict(row) for row in cursor.fetchall()]
+        rows, options = _load_exam_question_rows(cursor, exam_id)
+        questions = []
+        for row in rows:
+            question = dict(row)
+            question['options'] = options.get(row['id'])
+            questions.append(question)
         
         logger.info(f"Retrieved exam details for ID: {exam_id}")
         return exam, questions
 
+def upsert_exams(records, batch_size=100):
+    """
+    批量导入试卷及题目，按内容哈希去重更新
+    :param records: 可迭代的 (exam, questions) 元组，字段与表结构一致
+    :param batch_size: 每个事务处理的试卷数量
+    内容未变化的记录不会写入，也不会更新 last_modified，以免影响增量同步
+    :return: (新增试卷数, 更新试卷数, 未变化试卷数, 写入题目数)
+    """
+    inserted = updated = unchanged = question_count = 0
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        pending = 0
+        for exam, questions in records:
+            exam_hash = exam.get('content_hash') or content_hash(exam, EXAM_HASH_FIELDS)
+            now = datetime.now()
+            cursor.execute(
+                'SELECT id, is_real, has_analysis, status FROM exams WHERE content_hash = ?', (exam_hash,))
+            row = cursor.fetchone()
+            is_new = row is None
+            changed = False
+            if row:
+                exam_id = row['id']
+                incoming = (exam.get('is_real'), exam.get('has_analysis'), exam.get('status', 'pending'))
+                if incoming != (row['is_real'], row['has_analysis'], row['status']):
+                    cursor.execute('''
+                        UPDATE exams SET is_real = ?, has_analysis = ?, status = ?, last_modified = ?
+                        WHERE id = ?
+                    ''', incoming + (now, exam_id))
+                    changed = True
+            else:
+                cursor.execute('''
+                    INSERT INTO exams (
+                        title, subject, year, month, level, exam_type,
+                        is_real, has_analysis, file_path, file_type, status,
+                        content_hash, upload_date, last_modified
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    exam.get('title'), exam.get('subject'), exam.get('year'), exam.get('month'),
+                    exam.get('level'), exam.get('exam_type'), exam.get('is_real'), exam.get('has_analysis'),
+                    exam.get('file_path'), exam.get('file_type'), exam.get('status', 'pending'),
+                    exam_hash, exam.get('upload_date') or now, now
+                ))
+                exam_id = cursor.lastrowid
+
+            for question in questions:
+                question = dict(question, options=_normalize_options(question.get('options')))
+                question_hash = question.get('content_hash') or content_hash(question, QUESTION_HASH_FIELDS)
+                cursor.execute(
+                    'SELECT id, correct_answer, analysis FROM processed_questions WHERE exam_id = ? AND content_hash = ?',
+                    (exam_id, question_hash))
+                row = cursor.fetchone()
+                if row:
+                    incoming = (question.get('correct_answer'), question.get('analysis'))
+                    if incoming == (row['correct_answer'], row['analysis']):
+                        continue
+                    cursor.execute('''
+                        UPDATE processed_questions SET correct_answer = ?, analysis = ?, last_modified = ?
+                        WHERE id = ?
+                    ''', incoming + (now, row['id']))
+                else:
+                    _insert_question(cursor, exam_id, Question(
+                        number=question.get('question_number'),
+                        text=question.get('content'),
+                        type=question.get('question_type'),
+                        options=question['options'],
+                        correct_answer=question.get('correct_answer'),
+                        analysis=question.get('analysis')
+                    ), question_hash, question.get('processed_date'))
+                question_count += 1
+                changed = True
+
+            if is_new:
+                inserted += 1
+            elif changed:
+                updated += 1
+            else:
+                unchanged += 1
+            pending += 1
+            if pending >= batch_size:
+                conn.commit()
+                pending = 0
+        logger.info(f"Imported exams: {inserted} inserted, {updated} updated, "
+                    f"{unchanged} unchanged, {question_count} questions written")
+        return inserted, updated, unchanged, question_count
+
+def save_question_answer(question_id, correct_answer, analysis=None):
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE processed_questions
+            SET correct_answer = ?, analysis = ?, last_modified = ?
+            WHERE id = ?
+        ''', (correct_answer, analysis, datetime.now(), question_id))
+        logger.info(f"Saved answer for question ID: {question_id}")
+
 def update_exam_status(exam_id, status):
     with get_db_connection() as conn:
         cursor = conn.cursor()
@@ -172,6 +409,10 @@ def update_exam_status(exam_id, status):
 def delete_exam(exam_id):
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        cursor.execute('''
+            DELETE FROM question_options WHERE question_id IN (
+                SELECT id FROM processed_questions WHERE exam_id = ?)
+        ''', (exam_id,))
         cursor.execute('DELETE FROM processed_questions WHERE exam_id = ?', (exam_id,))
         cursor.execute('DELETE FROM exams WHERE id = ?', (exam_id,))
         logger.info(f"Deleted exam with ID: {exam_id}")
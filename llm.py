@@ -2,53 +2,203 @@ import requests
 from dotenv import load_dotenv
 import os
 import re
+import time
+import logging
+from cassette import Cassette, MODE_OFF
+from models import QuestionType
+from parser import detect_question_type
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+# 可通过 DEEPSEEK_BASE_URL 指向本地模拟服务（见 mock_server.py）
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1").rstrip('/')
+DEEPSEEK_API_URL = f"{DEEPSEEK_BASE_URL}/chat/completions"
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# 遇到 429 限流或 5xx 错误时的重试次数和退避基数（秒），服务端返回 Retry-After 时以其为准
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "1"))
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+# 录制/回放: LLM_CASSETTE_MODE=record|replay, LLM_CASSETTE=磁带文件路径
+_cassette = Cassette(
+    os.getenv("LLM_CASSETTE", "llm_cassette.jsonl"),
+    mode=os.getenv("LLM_CASSETTE_MODE", MODE_OFF),
+    replay_latency=os.getenv("LLM_CASSETTE_REPLAY_LATENCY", "0") == "1"
+)
+
+def _send_request(data):
+    headers = {
+        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    return requests.post(DEEPSEEK_API_URL, headers=headers, json=data, timeout=LLM_TIMEOUT)
 
-def get_llm_answer(question_number, question_text):
+def _retry_delay(response, attempt):
+    retry_after = response.headers.get('Retry-After')
     try:
-        prompt = f"""
-请回答以下试卷问题，题号为【{question_number}】。
-问题: {question_text}
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return LLM_RETRY_BACKOFF * (2 ** attempt)
+
+def _post_with_retry(data):
+    """发送请求，对 429/5xx 按 Retry-After 或指数退避重试，最终仍失败时抛出 HTTP 错误"""
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        response = _cassette.post(_send_request, data)
+        if response.status_code not in RETRYABLE_STATUS or attempt == LLM_MAX_RETRIES:
+            break
+        delay = _retry_delay(response, attempt)
+        logger.warning(f"LLM request got HTTP {response.status_code}, retrying in {delay}s "
+                       f"({attempt + 1}/{LLM_MAX_RETRIES})")
+        time.sleep(delay)
+    response.raise_for_status()
+    return response
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "deepseek-chat")
+
+class PromptProfile:
+    """按题型区分的提示词配置"""
+    def __init__(self, system, template, max_tokens, model_env, stop=None):
+        self.system = system
+        self.template = template
+        self.max_tokens = max_tokens
+        self.stop = stop
+        # 每种题型可通过环境变量单独指定模型，未设置时使用 LLM_MODEL
+        self.model = os.getenv(model_env) or DEFAULT_MODEL
+
+_CHOICE_TEMPLATE = """题号为【{number}】。
+{text}
+{options}
+只输出正确选项的字母{hint}，不要输出其他内容。"""
+
+_FULL_TEMPLATE = """
+请回答以下试卷问题，题号为【{number}】。
+问题: {text}{options}
 请按照以下格式回答:
-题号: {question_number}
+题号: {number}
 答案: [你的答案]
 解析: [详细解释你的答案的过程和理由]
 """
-        headers = {
-            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-            "Content-Type": "application/json"
-        }
+
+PROMPT_PROFILES = {
+    QuestionType.SINGLE_CHOICE: PromptProfile(
+        "你是试卷答题助手，只回答选项字母。",
+        _CHOICE_TEMPLATE, 8, "LLM_MODEL_SINGLE_CHOICE", stop=["\n"]),
+    QuestionType.MULTIPLE_CHOICE: PromptProfile(
+        "你是试卷答题助手，只回答选项字母。",
+        _CHOICE_TEMPLATE, 16, "LLM_MODEL_MULTIPLE_CHOICE", stop=["\n"]),
+    QuestionType.FILL_IN: PromptProfile(
+        "你是试卷答题助手，回答要简短。",
+        """题号为【{number}】。
+{text}
+只输出需要填写的内容，多个空用分号分隔，不要解释。""",
+        100, "LLM_MODEL_FILL_IN", stop=["\n\n"]),
+    QuestionType.PROGRAMMING: PromptProfile(
+        "你是一个专业的编程题解答助手。",
+        _FULL_TEMPLATE, 2000, "LLM_MODEL_PROGRAMMING"),
+    QuestionType.TEXT: PromptProfile(
+        "你是一个专业的试卷解答助手。",
+        _FULL_TEMPLATE, 1000, "LLM_MODEL_TEXT"),
+}
+
+def _format_options(options):
+    if not options:
+        return ""
+    return "\n".join(f"{key}. {value}" for key, value in options.items())
+
+def _parse_full_answer(answer_text):
+    answer_match = re.search(r'答案:(.*?)(?=解析:|$)', answer_text, re.DOTALL)
+    explanation_match = re.search(r'解析:(.*?)$', answer_text, re.DOTALL)
+    answer = answer_match.group(1).strip() if answer_match else ""
+    explanation = explanation_match.group(1).strip() if explanation_match else ""
+    return answer or answer_text, explanation
+
+def validate_choice_answer(answer_text, question_type, options):
+    """
+    根据解析出的选项在本地校验选择题答案
+    :return: (规范化后的答案, 是否合法)
+    """
+    answer_match = re.search(r'答案[:：](.*?)(?=解析|$)', answer_text, re.DOTALL)
+    candidate = answer_match.group(1) if answer_match else answer_text
+    # 只去掉紧跟在自身字母后面回显的选项内容（如 "B. Print"），
+    # 选项内容本身可能就是字母（如 C 语言、变量名），不能全局删除
+    label_text = candidate
+    for label, option_text in (options or {}).items():
+        if option_text:
+            label_text = re.sub(rf'(?<![A-Za-z]){re.escape(label)}\s*[\.、．:：\)）]\s*{re.escape(option_text)}',
+                                label, label_text)
+    valid_keys = set(options) if options else set("ABCD")
+    letters = set()
+    for token in re.findall(r'[A-Za-z]+', label_text):
+        # 单个字母不区分大小写；连写的多个大写字母（如 AC）视为多选答案
+        if (len(token) == 1 or token.isupper()) and set(token.upper()) <= valid_keys:
+            letters.update(token.upper())
+    letters = sorted(letters)
+    if not letters:
+        return candidate.strip(), False
+    if question_type == QuestionType.SINGLE_CHOICE and len(letters) != 1:
+        return "".join(letters), False
+    return "".join(letters), True
+
+def get_llm_answer(question_number, question_text, question_type=None, options=None):
+    try:
+        if question_type is None:
+            question_type = detect_question_type(question_text, options)
+        profile = PROMPT_PROFILES.get(question_type, PROMPT_PROFILES[QuestionType.TEXT])
+        is_choice = question_type in (QuestionType.SINGLE_CHOICE, QuestionType.MULTIPLE_CHOICE)
+
+        option_text = _format_options(options)
+        if option_text and not is_choice:
+            option_text = "\n选项:\n" + option_text
+        prompt = profile.template.format(
+            number=question_number,
+            text=question_text,
+            options=option_text,
+            hint="（可多选，如 AC）" if question_type == QuestionType.MULTIPLE_CHOICE else ""
+        )
         data = {
-            "model": "deepseek-chat",
+            "model": profile.model,
             "messages": [
-                {"role": "system", "content": "你是一个专业的试卷解答助手。"},
+                {"role": "system", "content": profile.system},
                 {"role": "user", "content": prompt}
             ],
-            "max_tokens": 1000
+            "max_tokens": profile.max_tokens
         }
-        response = requests.post(DEEPSEEK_API_URL, headers=headers, json=data)
+        if profile.stop:
+            data["stop"] = profile.stop
+        response = _post_with_retry(data)
         response_data = response.json()
         answer_text = response_data['choices'][0]['message']['content']
-        
-        answer_match = re.search(r'答案:(.*?)(?=解析:|$)', answer_text, re.DOTALL)
-        explanation_match = re.search(r'解析:(.*?)$', answer_text, re.DOTALL)
-        
-        answer = answer_match.group(1).strip() if answer_match else ""
-        explanation = explanation_match.group(1).strip() if explanation_match else ""
-        
+
+        confidence = 0.9
+        if is_choice:
+            answer, valid = validate_choice_answer(answer_text, question_type, options)
+            explanation = "" if valid else f"答案未通过选项校验: {answer_text.strip()}"
+            if not valid:
+                confidence = 0.3
+        elif question_type == QuestionType.FILL_IN:
+            answer, explanation = answer_text.strip(), ""
+        else:
+            answer, explanation = _parse_full_answer(answer_text)
+
         return {
-            'answer': answer or answer_text,
+            'answer': answer,
             'explanation': explanation,
-            'confidence': 0.9,
-            'model': "deepseek-chat"
+            'confidence': confidence,
+            'model': profile.model
         }
     except Exception as e:
+        # HTTP 错误（限流、服务端错误）带上状态码，便于压测统计
+        error_response = getattr(e, 'response', None)
         return {
             'answer': f"题号 {question_number} - 无法获取答案",
             'explanation': f"发生错误: {str(e)}",
             'confidence': 0.0,
-            'model': "error"
-        }
\ No newline at end of file
+            'model': "error",
+            'status_code': getattr(error_response, 'status_code', None)
+        }
+
+def answer_question(question):
+    """为 Question 对象生成答案"""
+    return get_llm_answer(question.number, question.text, question.type, question.options)
@@ -0,0 +1,176 @@
+"""本地 DeepSeek 兼容模拟服务
+
+实现 /v1/chat/completions 接口（含 stream 流式输出），用于离线压测答题流程。
+可调节响应延迟、错误率和 429 限流比例。
+
+用法:
+    python mock_server.py --port 8000 --latency 0.5 --error-rate 0.05 --rate-limit-rate 0.1
+然后设置环境变量 DEEPSEEK_BASE_URL=http://127.0.0.1:8000/v1
+"""
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+class MockConfig:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit_rate=0.0,
+                 chunk_delay=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_delay = chunk_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """返回 (延迟秒数, 随机数)，加锁保证固定 seed 下结果可复现"""
+        with self.lock:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            return delay, self.random.random()
+
+def build_answer(messages):
+    """根据题目构造一个符合答题格式的伪答案"""
+    prompt = messages[-1].get('content', '') if messages else ''
+    if '只输出正确选项的字母' in prompt:
+        return "A"
+    if '只输出需要填写的内容' in prompt:
+        return "模拟答案"
+    number_match = re.search(r'题号为【(.*?)】', prompt)
+    number = number_match.group(1) if number_match else "1"
+    return f"题号: {number}\n答案: A\n解析: 这是本地模拟服务返回的答案。"
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockConfig()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        # 先读完请求体，避免 keep-alive 连接上残留数据导致下一个请求解析失败
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+            return
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        delay, roll = self.config.draw()
+        if delay:
+            time.sleep(delay)
+        if roll < self.config.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                            headers={"Retry-After": "1"})
+            return
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._send_json(500, {"error": {"message": "Internal server error", "type": "server_error"}})
+            return
+
+        model = data.get('model', 'deepseek-chat')
+        content = build_answer(data.get('messages', []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        if data.get('stream'):
+            self._stream(completion_id, created, model, content)
+        else:
+            prompt_tokens = sum(len(m.get('content', '')) for m in data.get('messages', []))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(content),
+                    "total_tokens": prompt_tokens + len(content)
+                }
+            })
+
+    def _stream(self, completion_id, created, model, content):
+        """以 SSE 格式逐行输出，与官方 stream 接口一致"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send_chunk(delta, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+
+        send_chunk({"role": "assistant", "content": ""})
+        for piece in re.findall(r'.{1,8}', content, re.DOTALL):
+            if self.config.chunk_delay:
+                time.sleep(self.config.chunk_delay)
+            send_chunk({"content": piece})
+        send_chunk({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+def create_server(host='127.0.0.1', port=8000, config=None):
+    """创建模拟服务，port 为 0 时自动分配端口"""
+    handler = type('ConfiguredMockHandler', (MockHandler,), {'config': config or MockConfig()})
+    return ThreadingHTTPServer((host, port), handler)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="本地 DeepSeek 兼容模拟服务")
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="每个请求的基础延迟（秒）")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="额外随机延迟上限（秒）")
+    arg_parser.add_argument('--chunk-delay', type=float, default=0.0, help="流式输出每块之间的延迟（秒）")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="返回 500 错误的比例")
+    arg_parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="返回 429 限流的比例")
+    arg_parser.add_argument('--seed', type=int, default=None, help="随机种子，用于复现")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = MockConfig(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        rate_limit_rate=args.rate_limit_rate, chunk_delay=args.chunk_delay,
+                        seed=args.seed)
+    server = create_server(args.host, args.port, config)
+    logger.info(f"Mock server listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
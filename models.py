@@ -0,0 +1,35 @@
+"""解析、数据库和 LLM 各层共用的题目模型"""
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+class QuestionType:
+    SINGLE_CHOICE = "single_choice"
+    MULTIPLE_CHOICE = "multiple_choice"
+    FILL_IN = "fill_in"
+    PROGRAMMING = "programming"
+    TEXT = "text"
+
+@dataclass(slots=True)
+class Question:
+    number: str
+    text: str
+    type: str = QuestionType.TEXT
+    options: Optional[Dict[str, str]] = None
+    correct_answer: Optional[str] = None
+    analysis: Optional[str] = None
+    id: Optional[int] = None
+    exam_id: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row, options=None) -> 'Question':
+        """从 processed_questions 表的一行构造，选项由 question_options 表单独加载"""
+        return cls(
+            number=row['question_number'],
+            text=row['content'],
+            type=row['question_type'] or QuestionType.TEXT,
+            options=options or None,
+            correct_answer=row['correct_answer'],
+            analysis=row['analysis'],
+            id=row['id'],
+            exam_id=row['exam_id']
+        )
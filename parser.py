@@ -2,17 +2,16 @@ import re
 import PyPDF2
 import docx
 import logging
-import json
-from typing import List, Dict, Any, Optional
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Optional, Iterable, Iterator
+from models import Question, QuestionType
 
 logger = logging.getLogger(__name__)
 
-class QuestionType:
-    SINGLE_CHOICE = "single_choice"
-    MULTIPLE_CHOICE = "multiple_choice"
-    FILL_IN = "fill_in"
-    PROGRAMMING = "programming"
-    TEXT = "text"
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+QUESTION_START = re.compile(r'\d+[\.\、]')
 
 def detect_file_type(filename: str) -> str:
     lower_filename = filename.lower()
@@ -22,7 +21,7 @@ def detect_file_type(filename: str) -> str:
     elif lower_filename.endswith('.txt'): return 'txt'
     return 'unknown'
 
-def parse_exam_file(file_path: str, file_type: str) -> Dict[str, List[Dict[str, Any]]]:
+def parse_exam_file(file_path: str, file_type: str) -> Dict[str, List[Question]]:
     try:
         if file_type == 'pdf':
             questions = parse_pdf_file(file_path)
@@ -51,8 +50,10 @@ def extract_options(text: str) -> Optional[Dict[str, str]]:
 def detect_question_type(text: str, options: Optional[Dict[str, str]] = None) -> str:
     """检测题目类型"""
     if options:
-        # 根据选项数量判断是单选还是多选
-        return QuestionType.SINGLE_CHOICE if len(options) <= 4 else QuestionType.MULTIPLE_CHOICE
+        # 题干标注多选/不定项，或选项超过4个时视为多选
+        if re.search(r'多选|多项选择|不定项', text) or len(options) > 4:
+            return QuestionType.MULTIPLE_CHOICE
+        return QuestionType.SINGLE_CHOICE
     elif re.search(r'编程题|程序题|代码题', text):
         return QuestionType.PROGRAMMING
     elif re.search(r'填空题|填写', text):
@@ -60,7 +61,7 @@ def detect_question_type(text: str, options: Optional[Dict[str, str]] = None) ->
     else:
         return QuestionType.TEXT
 
-def parse_question(text: str) -> Dict[str, Any]:
+def parse_question(text: str) -> Optional[Question]:
     """解析单个题目"""
     try:
         # 提取题号
@@ -80,17 +81,17 @@ def parse_question(text: str) -> Dict[str, Any]:
         # 检测题目类型
         question_type = detect_question_type(question_content, options)
         
-        return {
-            'number': question_number,
-            'text': question_content,
-            'type': question_type,
-            'options': json.dumps(options) if options else None
-        }
+        return Question(
+            number=question_number,
+            text=question_content,
+            type=question_type,
+            options=options
+        )
     except Exception as e:
         logger.error(f"Error parsing question: {str(e)}")
         return None
 
-def parse_pdf_file(file_path: str) -> List[Dict[str, Any]]:
+def parse_pdf_file(file_path: str) -> List[Question]:
     questions = []
     try:
         with open(file_path, 'rb') as file:
@@ -118,18 +119,90 @@ def parse_pdf_file(file_path: str) -> List[Dict[str, Any]]:
     
     return questions
 
-def parse_word_file(file_path: str) -> List[Dict[str, Any]]:
+def _iter_docx_xml_paragraphs(file_path: str) -> Iterator[str]:
+    """直接增量解析 word/document.xml，按段落输出文本（包括表格中的段落）"""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open('word/document.xml') as xml_file:
+            stack = []
+            paragraphs = []
+            fallback_depth = 0
+            for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+                if event == 'start':
+                    if not stack and elem.tag != WORD_NS + 'document':
+                        raise ValueError(f"Unexpected root element: {elem.tag}")
+                    stack.append(elem)
+                    if elem.tag == WORD_NS + 'p':
+                        paragraphs.append([])
+                    elif elem.tag == MC_FALLBACK:
+                        # 兼容内容的 Fallback 分支与 Choice 分支重复，跳过
+                        fallback_depth += 1
+                    continue
+
+                stack.pop()
+                tag = elem.tag
+                if tag == MC_FALLBACK:
+                    fallback_depth -= 1
+                elif paragraphs and not fallback_depth:
+                    if tag == WORD_NS + 't':
+                        paragraphs[-1].append(elem.text or '')
+                    elif tag == WORD_NS + 'tab':
+                        paragraphs[-1].append('\t')
+                    elif tag in (WORD_NS + 'br', WORD_NS + 'cr'):
+                        paragraphs[-1].append('\n')
+                # 文本已在上面逐步收集，元素结束后立即释放并从父节点摘除，
+                # 表格的行、单元格等也不会在内存中累积
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+                if tag == WORD_NS + 'p':
+                    text = ''.join(paragraphs.pop())
+                    if not fallback_depth:
+                        yield text
+
+def _iter_docx_document_paragraphs(file_path: str) -> Iterator[str]:
+    doc = docx.Document(file_path)
+    for paragraph in doc.paragraphs:
+        yield paragraph.text
+
+def iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    """逐段读取 Word 文档文本，无法直接解析 XML 时回退到 python-docx"""
+    try:
+        with zipfile.ZipFile(file_path) as archive:
+            archive.getinfo('word/document.xml')
+    except (zipfile.BadZipFile, KeyError) as e:
+        logger.warning(f"Falling back to python-docx for {file_path}: {str(e)}")
+        yield from _iter_docx_document_paragraphs(file_path)
+        return
+
+    count = 0
+    try:
+        for text in _iter_docx_xml_paragraphs(file_path):
+            count += 1
+            yield text
+    except (ET.ParseError, ValueError) as e:
+        if count:
+            raise
+        logger.warning(f"Falling back to python-docx for {file_path}: {str(e)}")
+        yield from _iter_docx_document_paragraphs(file_path)
+
+def iter_question_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """按题号切分文本行，逐题输出题目文本"""
+    block = None
+    for text in lines:
+        for line in text.split('\n'):
+            if QUESTION_START.match(line):
+                if block is not None:
+                    yield '\n'.join(block).strip()
+                block = [line]
+            elif block is not None:
+                block.append(line)
+    if block is not None:
+        yield '\n'.join(block).strip()
+
+def parse_word_file(file_path: str) -> List[Question]:
     questions = []
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        
-        # 使用更健壮的题目分割模式
-        question_pattern = r'(?:^|\n)(\d+[\.\、][^\n]*(?:\n(?!\d+[\.\、])[^\n]*)*)'
-        matches = re.finditer(question_pattern, text, re.MULTILINE)
-        
-        for match in matches:
-            question_text = match.group(1).strip()
+        for question_text in iter_question_blocks(iter_docx_paragraphs(file_path)):
             parsed = parse_question(question_text)
             if parsed:
                 questions.append(parsed)
@@ -141,7 +214,7 @@ def parse_word_file(file_path: str) -> List[Dict[str, Any]]:
     
     return questions
 
-def parse_text_file(file_path: str) -> List[Dict[str, Any]]:
+def parse_text_file(file_path: str) -> List[Question]:
     questions = []
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from cassette import (Cassette, CassetteMiss, RecordedHTTPError, MODE_OFF, MODE_RECORD, MODE_REPLAY,
+                      request_key)
+
+class FakeResponse:
+    def __init__(self, status_code, text, headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+PAYLOAD = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "题号为【1】"}]}
+
+def answer(content):
+    return json.dumps({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+def test_record_then_replay_in_order(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = Cassette(path, MODE_RECORD)
+    responses = iter([
+        FakeResponse(429, '{"error": {}}', {"Retry-After": "1"}),
+        FakeResponse(502, "<html>Bad Gateway</html>"),
+        FakeResponse(200, answer("A")),
+    ])
+    for _ in range(3):
+        recorder.post(lambda payload: next(responses), PAYLOAD)
+
+    player = Cassette(path, MODE_REPLAY)
+    first = player.post(None, PAYLOAD)
+    assert first.status_code == 429
+    assert first.headers == {"Retry-After": "1"}
+    with pytest.raises(RecordedHTTPError):
+        first.raise_for_status()
+    second = player.post(None, PAYLOAD)
+    assert (second.status_code, second.text) == (502, "<html>Bad Gateway</html>")
+    third = player.post(None, PAYLOAD)
+    assert third.json()['choices'][0]['message']['content'] == "A"
+    third.raise_for_status()
+    # 回放完后从头循环
+    assert player.post(None, PAYLOAD).status_code == 429
+
+def test_record_keeps_elapsed(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    Cassette(str(path), MODE_RECORD).post(lambda payload: FakeResponse(200, answer("B")), PAYLOAD)
+    entry = json.loads(path.read_text(encoding='utf-8'))
+    assert entry['key'] == request_key(PAYLOAD)
+    assert entry['elapsed'] >= 0
+
+def test_replay_miss(tmp_path):
+    path = str(tmp_path / "cassette.jsonl")
+    Cassette(path, MODE_RECORD).post(lambda payload: FakeResponse(200, answer("A")), PAYLOAD)
+    with pytest.raises(CassetteMiss):
+        Cassette(path, MODE_REPLAY).post(None, dict(PAYLOAD, max_tokens=8))
+
+def test_replay_requires_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.jsonl"), MODE_REPLAY)
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "cassette.jsonl"), "rewind")
+
+def test_off_mode_passes_through(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    response = FakeResponse(200, answer("A"))
+    assert Cassette(str(path), MODE_OFF).post(lambda payload: response, PAYLOAD) is response
+    assert not path.exists()
@@ -0,0 +1,86 @@
+import pytest
+
+import db
+from models import Question, QuestionType
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db.DatabaseConnection().close_all()
+    monkeypatch.chdir(tmp_path)
+    db.init_db()
+    yield tmp_path
+    db.DatabaseConnection().close_all()
+
+def new_exam():
+    return db.save_exam("2024-3-1-Python", "s", 2024, 3, 1, "Python", True, False, "uploads/a.pdf", ".pdf")
+
+def count_rows(table):
+    with db.get_db_connection() as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+def test_save_and_load_questions(temp_db):
+    exam_id = new_exam()
+    questions = [
+        Question("1", "下列哪个是关键字", QuestionType.SINGLE_CHOICE, {"A": "def", "B": "func"}, "A"),
+        Question("2", "填写输出结果", QuestionType.FILL_IN),
+    ]
+    assert db.save_questions(exam_id, questions) == 2
+    assert all(q.id is not None and q.exam_id == exam_id for q in questions)
+
+    loaded = db.load_questions(exam_id)
+    assert loaded == questions
+    assert loaded[1].options is None
+
+def test_save_processed_question_accepts_legacy_json_options(temp_db):
+    exam_id = new_exam()
+    question_id = db.save_processed_question(
+        exam_id, "1", "下列哪个是关键字", QuestionType.SINGLE_CHOICE, '{"A": "def", "B": "func"}', "B")
+    db.save_processed_question(exam_id, "2", "简答题", options='')
+
+    loaded = db.load_questions(exam_id)
+    assert loaded[0].id == question_id
+    assert loaded[0].options == {"A": "def", "B": "func"}
+    assert loaded[1].options is None
+    _, details = db.get_exam_details(exam_id)
+    assert details[0]['options'] == {"A": "def", "B": "func"}
+
+def test_find_questions_by_type_and_answer(temp_db):
+    exam_id = new_exam()
+    db.save_questions(exam_id, [
+        Question("1", "q1", QuestionType.SINGLE_CHOICE, {"A": "x", "B": "y", "C": "z"}, "C"),
+        Question("2", "q2", QuestionType.SINGLE_CHOICE, {"A": "x", "B": "y"}, "A"),
+        Question("3", "q3", QuestionType.MULTIPLE_CHOICE, {"A": "x", "C": "z"}, "C"),
+    ])
+    other_exam = new_exam()
+    db.save_questions(other_exam, [Question("1", "q4", QuestionType.SINGLE_CHOICE, {"C": "w"}, "C")])
+
+    found = db.find_questions(QuestionType.SINGLE_CHOICE, "C")
+    assert [(q.text, q.options) for q in found] == [("q1", {"A": "x", "B": "y", "C": "z"}), ("q4", {"C": "w"})]
+    assert [q.text for q in db.find_questions(QuestionType.SINGLE_CHOICE, "C", exam_id=other_exam)] == ["q4"]
+    assert len(db.find_questions(correct_answer="C")) == 3
+
+def test_type_and_answer_lookup_uses_index(temp_db):
+    with db.get_db_connection() as conn:
+        plan = conn.execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM processed_questions WHERE question_type = ? AND correct_answer = ?',
+            (QuestionType.SINGLE_CHOICE, "C")).fetchall()
+    assert any('idx_question_type_answer' in row['detail'] for row in plan)
+
+def test_save_question_answer(temp_db):
+    exam_id = new_exam()
+    question = Question("1", "q1", QuestionType.SINGLE_CHOICE, {"A": "x", "B": "y"})
+    db.save_questions(exam_id, [question])
+    db.save_question_answer(question.id, "B", "解析")
+    assert [q.number for q in db.find_questions(QuestionType.SINGLE_CHOICE, "B")] == ["1"]
+    assert db.load_questions(exam_id)[0].analysis == "解析"
+
+def test_delete_exam_removes_options(temp_db):
+    exam_id = new_exam()
+    kept_exam = new_exam()
+    db.save_questions(exam_id, [Question("1", "q1", QuestionType.SINGLE_CHOICE, {"A": "x", "B": "y"})])
+    db.save_questions(kept_exam, [Question("1", "q2", QuestionType.SINGLE_CHOICE, {"A": "z"})])
+
+    db.delete_exam(exam_id)
+    assert count_rows('question_options') == 1
+    assert db.load_questions(exam_id) == []
+    assert db.load_questions(kept_exam)[0].options == {"A": "z"}
@@ -0,0 +1,72 @@
+import threading
+
+import pytest
+
+import llm
+from llm import validate_choice_answer
+from mock_server import MockConfig, create_server
+from models import QuestionType
+from parser import detect_question_type
+
+OPTIONS = {"A": "print", "B": "Print", "C": "input", "D": "I/O"}
+
+def test_choice_answer_ignores_echoed_option_text():
+    assert validate_choice_answer("B. Print", QuestionType.SINGLE_CHOICE, OPTIONS) == ("B", True)
+    assert validate_choice_answer("答案: D. I/O\n解析: ...", QuestionType.SINGLE_CHOICE, OPTIONS) == ("D", True)
+
+def test_choice_answer_accepts_lowercase_label():
+    assert validate_choice_answer("b", QuestionType.SINGLE_CHOICE, OPTIONS) == ("B", True)
+
+def test_choice_answer_rejects_unknown_label():
+    assert validate_choice_answer("E", QuestionType.SINGLE_CHOICE, OPTIONS)[1] is False
+    assert validate_choice_answer("不知道", QuestionType.SINGLE_CHOICE, OPTIONS)[1] is False
+
+def test_option_text_that_is_a_letter_is_kept():
+    languages = {"A": "Java", "B": "C", "C": "Python", "D": "Go"}
+    assert validate_choice_answer("C", QuestionType.SINGLE_CHOICE, languages) == ("C", True)
+    assert validate_choice_answer("B", QuestionType.SINGLE_CHOICE, languages) == ("B", True)
+    assert validate_choice_answer("B. C", QuestionType.SINGLE_CHOICE, languages) == ("B", True)
+    assert validate_choice_answer("C、Python", QuestionType.SINGLE_CHOICE, languages) == ("C", True)
+    variables = {"A": "1", "B": "2", "C": "A", "D": "B"}
+    assert validate_choice_answer("A", QuestionType.SINGLE_CHOICE, variables) == ("A", True)
+    assert validate_choice_answer("D. B", QuestionType.SINGLE_CHOICE, variables) == ("D", True)
+
+def test_multiple_letters_rejected_for_single_choice():
+    assert validate_choice_answer("AC", QuestionType.SINGLE_CHOICE, OPTIONS) == ("AC", False)
+    assert validate_choice_answer("AC", QuestionType.MULTIPLE_CHOICE, OPTIONS) == ("AC", True)
+    assert validate_choice_answer("A、C", QuestionType.MULTIPLE_CHOICE, OPTIONS) == ("AC", True)
+
+def test_detect_multiple_choice_from_wording():
+    assert detect_question_type("下列说法正确的是（多选）", {"A": "x", "B": "y"}) == QuestionType.MULTIPLE_CHOICE
+    assert detect_question_type("以下哪些是关键字（不定项）", {"A": "x"}) == QuestionType.MULTIPLE_CHOICE
+    assert detect_question_type("下列说法正确的是", {"A": "x", "B": "y"}) == QuestionType.SINGLE_CHOICE
+
+@pytest.fixture
+def mock_endpoint(monkeypatch):
+    servers = []
+    def start(config):
+        server = create_server(port=0, config=config)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(llm, 'DEEPSEEK_API_URL', f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions")
+    monkeypatch.setattr(llm.time, 'sleep', lambda seconds: None)
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_rate_limit_is_retried_then_reported(mock_endpoint, monkeypatch):
+    mock_endpoint(MockConfig(rate_limit_rate=1.0))
+    calls = []
+    send = llm._send_request
+    monkeypatch.setattr(llm, '_send_request', lambda data: calls.append(data) or send(data))
+    result = llm.get_llm_answer("1", "下列说法正确的是", QuestionType.SINGLE_CHOICE, OPTIONS)
+    assert len(calls) == llm.LLM_MAX_RETRIES + 1
+    assert result['status_code'] == 429
+    assert result['confidence'] == 0.0
+
+def test_answer_from_mock_server(mock_endpoint):
+    mock_endpoint(MockConfig())
+    result = llm.get_llm_answer("1", "下列说法正确的是", QuestionType.SINGLE_CHOICE, OPTIONS)
+    assert result['answer'] == "A"
+    assert result['confidence'] == 0.9
@@ -0,0 +1,84 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from mock_server import MockConfig, create_server
+
+@pytest.fixture
+def start_server():
+    servers = []
+    def start(config=None):
+        server = create_server(port=0, config=config)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server.server_address[1]
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def post(connection, path, body):
+    data = body if isinstance(body, bytes) else json.dumps(body, ensure_ascii=False).encode('utf-8')
+    connection.request('POST', path, body=data, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response, response.read().decode('utf-8')
+
+def chat(content, **extra):
+    return dict({"model": "deepseek-chat", "messages": [{"role": "user", "content": content}]}, **extra)
+
+def test_chat_completion(start_server):
+    connection = http.client.HTTPConnection('127.0.0.1', start_server())
+    response, body = post(connection, '/v1/chat/completions', chat("请回答以下试卷问题，题号为【7】。"))
+    assert response.status == 200
+    data = json.loads(body)
+    assert data['object'] == "chat.completion"
+    assert data['choices'][0]['message']['content'].startswith("题号: 7\n答案: A")
+    assert data['usage']['total_tokens'] == data['usage']['prompt_tokens'] + data['usage']['completion_tokens']
+
+def test_choice_prompt_gets_letter(start_server):
+    connection = http.client.HTTPConnection('127.0.0.1', start_server())
+    _, body = post(connection, '/v1/chat/completions', chat("只输出正确选项的字母，不要输出其他内容。"))
+    assert json.loads(body)['choices'][0]['message']['content'] == "A"
+
+def test_streaming_reply(start_server):
+    connection = http.client.HTTPConnection('127.0.0.1', start_server())
+    response, body = post(connection, '/v1/chat/completions', chat("题号为【3】", stream=True))
+    assert response.status == 200
+    assert response.getheader('Content-Type') == "text/event-stream"
+    events = [line[len("data: "):] for line in body.split("\n\n") if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(event) for event in events[:-1]]
+    assert all(chunk['object'] == "chat.completion.chunk" for chunk in chunks)
+    assert chunks[-1]['choices'][0]['finish_reason'] == "stop"
+    content = "".join(chunk['choices'][0]['delta'].get('content', '') for chunk in chunks)
+    assert content.startswith("题号: 3\n答案: A")
+
+def test_error_paths_keep_connection_usable(start_server):
+    connection = http.client.HTTPConnection('127.0.0.1', start_server())
+    response, _ = post(connection, '/v1/unknown', chat("x"))
+    assert response.status == 404
+    response, _ = post(connection, '/v1/chat/completions', b'{not json')
+    assert response.status == 400
+    # 同一 keep-alive 连接上的后续请求不受未读请求体影响
+    response, _ = post(connection, '/v1/chat/completions', chat("x"))
+    assert response.status == 200
+
+def test_rate_limit_injection(start_server):
+    connection = http.client.HTTPConnection('127.0.0.1', start_server(MockConfig(rate_limit_rate=1.0)))
+    response, body = post(connection, '/v1/chat/completions', chat("x"))
+    assert response.status == 429
+    assert response.getheader('Retry-After') == "1"
+    assert json.loads(body)['error']['type'] == "rate_limit_error"
+
+def test_seeded_fault_injection_is_reproducible(start_server):
+    def statuses(port):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        return [post(connection, '/v1/chat/completions', chat("x"))[0].status for _ in range(30)]
+
+    config = dict(error_rate=0.3, rate_limit_rate=0.3, seed=7)
+    first = statuses(start_server(MockConfig(**config)))
+    second = statuses(start_server(MockConfig(**config)))
+    assert first == second
+    assert {200, 429, 500} <= set(first)
@@ -0,0 +1,112 @@
+import io
+import tracemalloc
+import zipfile
+
+import pytest
+
+import parser
+from models import QuestionType
+
+NAMESPACES = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+              'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"')
+
+def paragraph(*runs):
+    return '<w:p><w:r>' + ''.join(runs) + '</w:r></w:p>'
+
+def text(value):
+    return f'<w:t>{value}</w:t>'
+
+def build_docx(body=None, document_xml=None):
+    if document_xml is None:
+        document_xml = f'<w:document {NAMESPACES}><w:body>{body}<w:sectPr/></w:body></w:document>'
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        if document_xml is not False:
+            archive.writestr('word/document.xml', document_xml)
+        archive.writestr('[Content_Types].xml', '<Types/>')
+    buffer.seek(0)
+    return buffer
+
+class FakeParagraph:
+    def __init__(self, text):
+        self.text = text
+
+@pytest.fixture
+def fake_python_docx(monkeypatch):
+    calls = []
+    def document(file_path):
+        calls.append(file_path)
+        return type('FakeDocument', (), {'paragraphs': [FakeParagraph("来自 python-docx")]})()
+    monkeypatch.setattr(parser.docx, 'Document', document)
+    return calls
+
+def test_paragraph_order_with_table_and_textbox():
+    textbox = '<w:txbxContent>' + paragraph(text('文本框内容')) + '</w:txbxContent>'
+    body = (
+        paragraph(text('1. 正文题目'))
+        + paragraph(text('A'), '<w:tab/>', text('def'), '<w:br/>', text('B'), '<w:tab/>', text('func'))
+        + '<w:tbl><w:tr><w:tc>' + paragraph(text('2、表格中的题目')) + '</w:tc>'
+        + '<w:tc>' + paragraph(text('单元格二')) + '</w:tc></w:tr></w:tbl>'
+        + '<w:p><w:r>' + text('外层段落')
+        + '<mc:AlternateContent><mc:Choice>' + textbox + '</mc:Choice>'
+        + '<mc:Fallback>' + textbox + '</mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    )
+    assert list(parser.iter_docx_paragraphs(build_docx(body))) == [
+        '1. 正文题目',
+        'A\tdef\nB\tfunc',
+        '2、表格中的题目',
+        '单元格二',
+        '文本框内容',
+        '外层段落',
+    ]
+
+def test_question_blocks_from_docx():
+    body = ''.join(paragraph(text(t)) for t in [
+        '一、选择题', '1. 下列哪个是关键字', 'A. def', 'B. func', '', '2、填写输出结果'])
+    questions = parser.parse_word_file(build_docx(body))
+    assert [q.number for q in questions] == ['1', '2']
+    assert questions[0].options == {'A': 'def', 'B': 'func'}
+    assert questions[0].type == QuestionType.SINGLE_CHOICE
+    assert questions[1].text == '填写输出结果'
+
+def test_missing_document_xml_falls_back_to_python_docx(fake_python_docx):
+    source = build_docx(document_xml=False)
+    assert list(parser.iter_docx_paragraphs(source)) == ["来自 python-docx"]
+    assert fake_python_docx == [source]
+
+def test_not_a_zip_falls_back_to_python_docx(fake_python_docx):
+    assert list(parser.iter_docx_paragraphs(io.BytesIO(b'not a zip'))) == ["来自 python-docx"]
+
+def test_unreadable_document_xml_falls_back_to_python_docx(fake_python_docx):
+    source = build_docx(document_xml=f'<w:document {NAMESPACES}><w:body><w:p>')
+    assert list(parser.iter_docx_paragraphs(source)) == ["来自 python-docx"]
+
+def test_unexpected_root_falls_back_to_python_docx(fake_python_docx):
+    source = build_docx(document_xml='<document><body/></document>')
+    assert list(parser.iter_docx_paragraphs(source)) == ["来自 python-docx"]
+
+def test_error_after_partial_output_is_raised(fake_python_docx):
+    source = build_docx(document_xml=f'<w:document {NAMESPACES}><w:body>' + paragraph(text('1. 题目')) + '<w:p>')
+    with pytest.raises(parser.ET.ParseError):
+        list(parser.iter_docx_paragraphs(source))
+    assert fake_python_docx == []
+
+def test_large_table_memory_stays_constant():
+    buffer = io.BytesIO()
+    rows = 50000
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('word/document.xml', 'w') as f:
+            f.write(f'<w:document {NAMESPACES}><w:body><w:tbl>'.encode('utf-8'))
+            for i in range(rows):
+                f.write(f'<w:tr><w:tc>{paragraph(text(f"{i}. 题目 {i}"))}</w:tc></w:tr>'.encode('utf-8'))
+            f.write(b'</w:tbl></w:body></w:document>')
+    buffer.seek(0)
+
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in parser.iter_docx_paragraphs(buffer))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert count == rows
+    assert peak < 2 * 1024 * 1024
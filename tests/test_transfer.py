@@ -0,0 +1,90 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import db
+import transfer
+from models import Question, QuestionType
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    db.DatabaseConnection().close_all()
+    monkeypatch.chdir(tmp_path)
+    db.init_db()
+    yield tmp_path
+    db.DatabaseConnection().close_all()
+
+def reset_db():
+    db.DatabaseConnection().close_all()
+    db.init_db()
+
+def seed_exams():
+    first = db.save_exam("2024-3-1-Python", "s", 2024, 3, 1, "Python", True, False, "uploads/a.pdf", ".pdf")
+    db.save_questions(first, [
+        Question("1", "下列哪个是关键字", QuestionType.SINGLE_CHOICE, {"A": "def", "B": "func"}, "A"),
+        Question("2", "填写输出结果", QuestionType.FILL_IN, correct_answer="3")
+    ])
+    second = db.save_exam("2023-6-2-C++", "s", 2023, 6, 2, "C++", False, True, "uploads/b.pdf", ".pdf")
+    db.save_questions(second, [Question("1", "编程题", QuestionType.PROGRAMMING)])
+    return first, second
+
+def exam_snapshot():
+    snapshot = {}
+    for exam in db.get_exams():
+        _, questions = db.get_exam_details(exam['id'])
+        snapshot[exam['content_hash']] = (exam, questions)
+    return snapshot
+
+def test_gzip_round_trip(temp_db):
+    seed_exams()
+    path = str(temp_db / "exams.jsonl.gz")
+    assert transfer.export_exams(path, compression='gzip') == 2
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+
+    reset_db()
+    assert transfer.import_exams(path, compression='gzip') == (2, 0, 0, 3)
+    _, questions = db.get_exam_details(db.get_exams({'year': 2024})[0]['id'])
+    assert [q['question_number'] for q in questions] == ["1", "2"]
+    assert questions[0]['options'] == {"A": "def", "B": "func"}
+    assert questions[0]['correct_answer'] == "A"
+
+def test_export_filters(temp_db):
+    seed_exams()
+    path = str(temp_db / "out.jsonl")
+    assert transfer.export_exams(path, {'year': 2024}) == 1
+    assert transfer.export_exams(path, {'exam_type': 'C++', 'level': 2}) == 1
+    assert transfer.export_exams(path, {'exam_type': 'C++', 'level': 1}) == 0
+    assert transfer.export_exams(path, {'since': datetime.now() - timedelta(days=1)}) == 2
+    assert transfer.export_exams(path, {'since': datetime.now() + timedelta(days=1)}) == 0
+
+def test_reimport_same_file_changes_nothing(temp_db):
+    seed_exams()
+    path = str(temp_db / "exams.jsonl.gz")
+    transfer.export_exams(path, compression='gzip')
+    before = exam_snapshot()
+    cutoff = datetime.now()
+
+    assert transfer.import_exams(path, compression='gzip') == (0, 0, 2, 0)
+    assert transfer.import_exams(path, compression='gzip') == (0, 0, 2, 0)
+    assert exam_snapshot() == before
+    assert transfer.export_exams(str(temp_db / "since.jsonl"), {'since': cutoff}) == 0
+
+def test_import_updates_changed_answer_only(temp_db):
+    seed_exams()
+    path = temp_db / "exams.jsonl"
+    transfer.export_exams(str(path))
+    records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    for record in records:
+        if record['exam']['year'] == 2024:
+            record['questions'][0]['correct_answer'] = "B"
+    path.write_text("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records), encoding='utf-8')
+    cutoff = datetime.now()
+
+    assert transfer.import_exams(str(path)) == (0, 1, 1, 1)
+    assert len(db.find_questions(QuestionType.SINGLE_CHOICE, "B")) == 1
+    since_path = temp_db / "since.jsonl"
+    assert transfer.export_exams(str(since_path), {'since': cutoff}) == 1
+    assert json.loads(since_path.read_text(encoding='utf-8'))['exam']['year'] == 2024
@@ -0,0 +1,152 @@
+"""试卷数据导入导出
+
+以 JSONL 格式（每行一份试卷及其题目和答案）流式导出/导入，支持 gzip/zstd 压缩。
+
+用法:
+    python transfer.py export exams.jsonl.gz --year 2024 --exam-type Python
+    python transfer.py export nightly.jsonl.zst --since-file .last_sync
+    python transfer.py import exams.jsonl.gz
+"""
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from db import get_exams, get_exam_details, upsert_exams
+
+logger = logging.getLogger(__name__)
+
+def detect_compression(path):
+    lower_path = path.lower()
+    if lower_path.endswith('.gz'): return 'gzip'
+    elif lower_path.endswith('.zst'): return 'zstd'
+    return None
+
+@contextmanager
+def open_stream(path, mode, compression=None):
+    """
+    打开文本流，按需套上压缩层
+    :param mode: 'r' 或 'w'
+    :param compression: None、'gzip' 或 'zstd'
+    """
+    if compression == 'gzip':
+        with gzip.open(path, mode + 't', encoding='utf-8') as f:
+            yield f
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        with open(path, mode + 'b') as raw:
+            if mode == 'w':
+                with zstandard.ZstdCompressor().stream_writer(raw) as writer:
+                    with io.TextIOWrapper(writer, encoding='utf-8') as f:
+                        yield f
+            else:
+                with zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+                    yield io.TextIOWrapper(reader, encoding='utf-8')
+    elif compression is None:
+        with open(path, mode, encoding='utf-8') as f:
+            yield f
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+def iter_exam_records(filters=None):
+    """逐份生成 (exam, questions)，每次只在内存中保留一份试卷的题目"""
+    for exam in get_exams(filters):
+        exam, questions = get_exam_details(exam['id'])
+        exam.pop('id', None)
+        for question in questions:
+            question.pop('id', None)
+            question.pop('exam_id', None)
+        yield exam, questions
+
+def iter_export_lines(filters=None):
+    for exam, questions in iter_exam_records(filters):
+        yield json.dumps({'exam': exam, 'questions': questions}, ensure_ascii=False, default=str) + "\n"
+
+def iter_import_records(lines):
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {str(e)}")
+        yield record['exam'], record.get('questions', [])
+
+def export_exams(path, filters=None, compression=None):
+    """
+    导出试卷到 JSONL 文件
+    :param filters: 与 get_exams 相同的过滤条件，另支持 since
+    :return: 导出的试卷数量
+    """
+    count = 0
+    with open_stream(path, 'w', compression) as f:
+        for line in iter_export_lines(filters):
+            f.write(line)
+            count += 1
+    logger.info(f"Exported {count} exams to {path}")
+    return count
+
+def import_exams(path, compression=None, batch_size=100):
+    """
+    从 JSONL 文件导入试卷，按内容哈希去重
+    :return: (新增试卷数, 更新试卷数, 未变化试卷数, 写入题目数)
+    """
+    with open_stream(path, 'r', compression) as f:
+        return upsert_exams(iter_import_records(f), batch_size=batch_size)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="试卷数据导入导出")
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="导出试卷")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--year', type=int)
+    export_parser.add_argument('--exam-type')
+    export_parser.add_argument('--level', type=int)
+    export_parser.add_argument('--since', help="只导出该时间之后修改过的试卷，如 2024-01-01 00:00:00")
+    export_parser.add_argument('--since-file', help="增量同步状态文件，读取上次同步时间并在导出后更新")
+    export_parser.add_argument('--compression', choices=['gzip', 'zstd', 'none'])
+
+    import_parser = subparsers.add_parser('import', help="导入试卷")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--batch-size', type=int, default=100)
+    import_parser.add_argument('--compression', choices=['gzip', 'zstd', 'none'])
+
+    args = arg_parser.parse_args()
+    if args.compression is None:
+        compression = detect_compression(args.path)
+    else:
+        compression = None if args.compression == 'none' else args.compression
+
+    if args.command == 'export':
+        filters = {}
+        if args.year is not None:
+            filters['year'] = args.year
+        if args.exam_type:
+            filters['exam_type'] = args.exam_type
+        if args.level is not None:
+            filters['level'] = args.level
+        since = args.since
+        if since is None and args.since_file and os.path.exists(args.since_file):
+            with open(args.since_file, 'r', encoding='utf-8') as f:
+                since = f.read().strip() or None
+        if since:
+            filters['since'] = datetime.fromisoformat(since)
+        started = datetime.now()
+        count = export_exams(args.path, filters, compression)
+        if args.since_file:
+            with open(args.since_file, 'w', encoding='utf-8') as f:
+                f.write(started.isoformat(sep=' '))
+        print(f"导出 {count} 份试卷")
+    else:
+        inserted, updated, unchanged, question_count = import_exams(args.path, compression, args.batch_size)
+        print(f"导入完成: 新增 {inserted} 份, 更新 {updated} 份, 未变化 {unchanged} 份, 写入题目 {question_count} 道")
+
+if __name__ == "__main__":
+    main()